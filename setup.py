@@ -4,11 +4,12 @@ setup(
     name='telemExplorer',
     version='1.0',
     packages=find_packages(),
-    install_requires=[
-        'fastkml',
-    ],
+    py_modules=['telemExplorer'],
+    install_requires=[],
     extras_require={
         'gui': ['tkinter'],
+        'speedups': ['orjson', 'isal', 'rapidgzip'],
+        'tables': ['pyarrow'],
     },
     entry_points={
         'console_scripts': [
@@ -1,138 +1,458 @@
-import json
-import gzip
+import argparse
 import os
+import shutil
+import threading
 import csv
-from fastkml import kml, styles
-from fastkml.geometry import LineString, Point
+import functools
+from array import array
+from collections import deque
+import bisect
+import itertools
+import math
+import mmap
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from operator import itemgetter, le
 from pathlib import Path
-import glob
+from xml.sax.saxutils import escape, quoteattr
 import tkinter as tk
 from tkinter import filedialog, messagebox
 
+try:
+    from orjson import loads as json_loads
+    # orjson can parse straight from a memory-mapped file
+    JSON_LOADS_ACCEPTS_BUFFER = True
+except ImportError:
+    JSON_LOADS_ACCEPTS_BUFFER = False
+    try:
+        from simdjson import loads as json_loads
+    except ImportError:
+        try:
+            from ujson import loads as json_loads
+        except ImportError:
+            from json import loads as json_loads
+
+try:
+    from isal.igzip import open as gzip_open, decompress as gzip_decompress
+except ImportError:
+    try:
+        from zlib_ng.gzip_ng import open as gzip_open, decompress as gzip_decompress
+    except ImportError:
+        from gzip import open as gzip_open, decompress as gzip_decompress
+
+try:
+    import rapidgzip
+except ImportError:
+    rapidgzip = None
+
+try:
+    import pyarrow
+    from pyarrow import feather, parquet
+except ImportError:
+    pyarrow = None
+
+# Archives of at least this size are decompressed with rapidgzip's parallel decoder when it is installed
+PARALLEL_GZIP_MIN_SIZE = 64 * 1024 * 1024
+
+# First two bytes of every gzip stream
+GZIP_MAGIC = b'\x1f\x8b'
+
+# Chunk size used when streaming decompressed data to disk
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Number of rows formatted at once when writing CSV files
+CSV_BATCH_SIZE = 4096
+
+# Size of the write buffer of exported CSV and KML files
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+def scan_folder(folder_path):
+    """
+    Scans the given folder once and returns the sorted paths of its *.dlog and *.dlog.gz files and the sorted names of
+    its *.gz files. A *.dlog.gz file is left out if the same *.dlog file has already been extracted next to it.
+    """
+    dlog_files = {}
+    dlog_gz_files = {}
+    gz_files = []
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            # is_file() is answered from the directory listing on most platforms, without an extra stat call
+            if not entry.is_file():
+                continue
+            if entry.name.endswith('.gz'):
+                gz_files.append(entry.name)
+                if entry.name.endswith('.dlog.gz'):
+                    dlog_gz_files[entry.name[:-len('.gz')]] = entry.path
+            elif entry.name.endswith('.dlog'):
+                dlog_files[entry.name] = entry.path
+
+    for name, path in dlog_gz_files.items():
+        dlog_files.setdefault(name, path)
+
+    return sorted(dlog_files.values()), sorted(gz_files)
+
 def find_dlog_files(folder_path):
     """
-    Returns a list of all *.dlog files in the given folder path.
+    Returns a list of all *.dlog files in the given folder path, including compressed *.dlog.gz files.
     """
-    dlog_files = glob.glob(folder_path + '/*.dlog')
+    dlog_files, _ = scan_folder(folder_path)
     return dlog_files
 
+def open_gz_file(file_path, parallelization=None):
+    """
+    Opens the given *.gz file for binary reading, using rapidgzip's multi-threaded decoder for large archives.
+    parallelization is the number of decoder threads, by default one per CPU.
+    """
+    if rapidgzip is not None and os.path.getsize(file_path) >= PARALLEL_GZIP_MIN_SIZE:
+        return rapidgzip.open(str(file_path), parallelization=parallelization or os.cpu_count())
+    return gzip_open(file_path, 'rb')
+
+def gunzip_file(input_file, output_file, parallelization=None):
+    """
+    Decompresses the *.gz file input_file to output_file.
+    """
+    with open_gz_file(input_file, parallelization) as f_in, open(output_file, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out, COPY_BUFFER_SIZE)
+
 def unzip_files(folder_path):
     """
     Given a folder path, unzips all *.gz files in the folder to a folder with the name of the first file in the folder
     without the extension.
     """
     # Get a list of all *.gz files in the folder
-    gz_files = [file for file in os.listdir(folder_path) if file.endswith('.gz')]
+    _, gz_files = scan_folder(folder_path)
 
     # Create the output folder with the name of the first file in the folder (without the extension)
     output_folder = Path(folder_path) / Path(gz_files[0]).stem.replace('.dlog', '')
     output_folder.mkdir(parents=True, exist_ok=True)
 
-    # Unzip each file to the output folder
-    for gz_file in gz_files:
-        input_file = Path(folder_path) / gz_file
-        output_file = output_folder / Path(gz_file).stem
+    # Unzip each file to the output folder, decompressing several files at once in worker processes
+    input_files = [Path(folder_path) / gz_file for gz_file in gz_files]
+    output_files = [output_folder / Path(gz_file).stem for gz_file in gz_files]
+
+    if len(gz_files) == 1:
+        gunzip_file(input_files[0], output_files[0])
+        return
 
-        with gzip.open(input_file, 'rb') as f_in, open(output_file, 'wb') as f_out:
-            f_out.write(f_in.read())
+    cpu_count = os.cpu_count() or 1
+    max_workers = min(cpu_count, len(gz_files))
+    # Share the CPUs between the workers so that rapidgzip does not start cpu_count decoder threads in each of them
+    parallelization = itertools.repeat(max(1, cpu_count // max_workers))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # Consume the results so that an error in any worker is raised here
+        list(executor.map(gunzip_file, input_files, output_files, parallelization))
+
+def load_json_file(file_path, parallelization=None):
+    """
+    Reads a single file, decompressing it first if it is a *.gz file or gzip-compressed *.dlog file, and returns its
+    non-empty JSON objects. parallelization is passed on to open_gz_file for *.gz files.
+    """
+    if file_path.endswith('.gz'):
+        with open_gz_file(file_path, parallelization) as f:
+            json_data = json_loads(f.read())
+    elif JSON_LOADS_ACCEPTS_BUFFER and os.path.getsize(file_path) > 0:
+        # Parse from a read-only memory map instead of copying the file into a bytes object first
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, \
+                memoryview(mapped) as buffer:
+            if buffer[:2] == GZIP_MAGIC:
+                json_data = json_loads(gzip_decompress(buffer))
+            else:
+                json_data = json_loads(buffer)
+    else:
+        data = Path(file_path).read_bytes()
+        if data[:2] == GZIP_MAGIC:
+            # The file may be gzip-compressed despite its .dlog extension
+            data = gzip_decompress(data)
+        json_data = json_loads(data)
+    return list(filter(None, json_data))  # remove empty JSON objects
+
+def iter_json_chunks(file_list):
+    """
+    Yields the list of non-empty JSON objects of each file in file_list, in order.
+    Files are read on a pool of worker threads so that file reads and decompression overlap with parsing.
+    At most one file per worker is read ahead of the consumer, so streaming through the result holds only a few
+    files in memory at a time.
+    """
+    if len(file_list) <= 1:
+        yield from map(load_json_file, file_list)
+        return
+
+    max_workers = min(32, len(file_list))
+    # Share the CPUs between the loader threads so that rapidgzip does not start cpu_count decoder threads in each
+    parallelization = max(1, (os.cpu_count() or 1) // max_workers)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        files = iter(file_list)
+        pending = deque(executor.submit(load_json_file, file_path, parallelization)
+                        for file_path in itertools.islice(files, max_workers))
+        while pending:
+            json_data = pending.popleft().result()
+            file_path = next(files, None)
+            if file_path is not None:
+                pending.append(executor.submit(load_json_file, file_path, parallelization))
+            yield json_data
 
 def combine_json_files(file_list):
     """
     Reads each file in file_list, combines the non-empty JSON objects into a single array, and returns the resulting array.
+    The array is allocated at its final size once all files are parsed, so it is never regrown while being filled.
     """
-    combined_json = []
-    for file_path in file_list:
-        with open(file_path, 'r') as f:
-            json_data = json.load(f)
-            non_empty_json = [j for j in json_data if j]  # remove empty JSON objects
-            combined_json.extend(non_empty_json)
+    chunks = list(iter_json_chunks(file_list))
+    combined_json = [None] * sum(map(len, chunks))
+    offset = 0
+    for chunk in chunks:
+        combined_json[offset:offset + len(chunk)] = chunk
+        offset += len(chunk)
     return combined_json
 
 
+def write_csv_rows(f, writer, json_data, keys):
+    """
+    Writes the values of keys for each JSON object in json_data as rows of the CSV file f, in batches of
+    CSV_BATCH_SIZE. The values of a batch are projected with one itemgetter call per object, falling back to
+    dict.get with '' for a missing key when an object in the batch lacks one of the keys. A batch whose values need
+    no quoting is formatted with a single %-format call and written at once, any other batch is handed to the csv
+    writer.
+    """
+    field_count = len(keys)
+    get_row = itemgetter(*keys) if field_count > 1 else None
+    row_format = ','.join(['%s'] * field_count) + '\r\n'
+
+    while True:
+        batch = list(itertools.islice(json_data, CSV_BATCH_SIZE))
+        if not batch:
+            break
+
+        rows = None
+        if get_row is not None:
+            try:
+                rows = list(map(get_row, batch))
+            except KeyError:
+                pass
+        if rows is None:
+            rows = [[json_obj.get(key, '') for key in keys] for json_obj in batch]
+
+        # A single empty field and None values are formatted differently by the csv module
+        if field_count > 1 and not any(None in row for row in rows):
+            rows_in_batch = len(rows)
+            text = (row_format * rows_in_batch) % tuple(itertools.chain.from_iterable(rows))
+            if ('"' not in text and text.count(',') == (field_count - 1) * rows_in_batch
+                    and text.count('\n') == rows_in_batch and text.count('\r') == rows_in_batch):
+                f.write(text)
+                continue
+
+        writer.writerows(rows)
+
 def write_json_to_csv(json_data, csv_file, downsample=0, keys_to_include=None):
     """
-    Writes the given JSON data to the specified CSV file.
+    Writes the given JSON data to the specified CSV file. json_data may be any iterable and is consumed once.
     """
-    with open(csv_file, 'w', newline='') as f:
+    json_data = iter(json_data)
+    with open(csv_file, 'w', newline='', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
         writer = csv.writer(f)
 
         if keys_to_include is None:
             # If keys_to_include is not provided, use all keys from the first JSON object
-            keys_to_include = json_data[0].keys()
+            first = next(json_data, {})
+            keys_to_include = first.keys()
+            json_data = itertools.chain([first], json_data)
+
+        keys_to_include = list(keys_to_include)
 
         # Write header row
         writer.writerow(keys_to_include)
 
         # Write each JSON object as a row in the CSV file, applying the downsample factor
-        for index, json_obj in enumerate(json_data):
-            if index % (downsample + 1) == 0:
-                row = [json_obj.get(key, '') for key in keys_to_include]
-                writer.writerow(row)
+        write_csv_rows(f, writer, itertools.islice(json_data, 0, None, downsample + 1), keys_to_include)
 
+def write_json_to_table(json_data, table_file, downsample=0, keys_to_include=None):
+    """
+    Writes the given JSON data to a Parquet file, or to a Feather file if table_file ends with '.feather'.
+    Values are stored as typed binary columns instead of being formatted as text. Requires pyarrow.
+    """
+    if pyarrow is None:
+        raise RuntimeError("Parquet and Feather export requires the pyarrow package.")
+
+    json_data = list(itertools.islice(json_data, 0, None, downsample + 1))
+    if keys_to_include is None:
+        # If keys_to_include is not provided, use all keys from the first JSON object
+        keys_to_include = json_data[0].keys() if json_data else []
+
+    # Missing values become nulls instead of empty strings
+    table = pyarrow.table({key: [entry.get(key) for entry in json_data] for key in keys_to_include})
+    if table_file.endswith('.feather'):
+        feather.write_feather(table, table_file, compression='lz4')
+    else:
+        parquet.write_table(table, table_file, compression='zstd')
+
+@functools.lru_cache(maxsize=65536)
 def timecode_to_milliseconds(timecode):
-    hours, minutes, seconds, frames = [int(part) for part in timecode.split(':')]
-    milliseconds = (hours * 3600 + minutes * 60 + seconds) * 1000 + frames * (1000 / 30)
-    return int(milliseconds)
+    """
+    Converts an 'HH:MM:SS:FF' timecode at 30 frames per second to milliseconds.
+    """
+    if (len(timecode) == 11 and timecode[2::3] == ':::' and timecode.isascii()
+            and (timecode[0:2] + timecode[3:5] + timecode[6:8] + timecode[9:11]).isdigit()):
+        # Fixed-width timecode: read the digits at their offsets instead of splitting and calling int() on each part
+        d = timecode.encode('ascii')
+        hours = (d[0] - 48) * 10 + d[1] - 48
+        minutes = (d[3] - 48) * 10 + d[4] - 48
+        seconds = (d[6] - 48) * 10 + d[7] - 48
+        frames = (d[9] - 48) * 10 + d[10] - 48
+    else:
+        hours, minutes, seconds, frames = [int(part) for part in timecode.split(':')]
+    return (hours * 3600 + minutes * 60 + seconds) * 1000 + frames * 1000 // 30
+
+
+def timecodes_to_milliseconds(timecodes):
+    """
+    Converts an iterable of timecodes to an array of milliseconds.
+    When all timecodes are fixed-width 'HH:MM:SS:FF' strings they are converted column-wise: the digits at each offset
+    are sliced out of one joined buffer and combined in a single comprehension, without a function call per timecode.
+    """
+    timecodes = list(timecodes)
+    count = len(timecodes)
+    joined = ''.join(timecodes)
+
+    # Every timecode must be 11 characters wide on its own: with mixed widths the separators of the joined buffer can
+    # still line up while the digits are misread
+    if count and set(map(len, timecodes)) == {11} and joined.isascii():
+        buffer = joined.encode('ascii')
+        digits = [buffer[offset::11] for offset in (0, 1, 3, 4, 6, 7, 9, 10)]
+        separators = buffer[2::11] + buffer[5::11] + buffer[8::11]
+        if separators == b':' * (3 * count) and b''.join(digits).isdigit():
+            # Each digit is still an ASCII code, so subtract 48 * 11 from every two-digit number
+            return array('q', [((h1 * 10 + h2) * 3600 + (m1 * 10 + m2) * 60 + s1 * 10 + s2 - 528 * 3661) * 1000
+                               + (f1 * 10 + f2 - 528) * 1000 // 30
+                               for h1, h2, m1, m2, s1, s2, f1, f2 in zip(*digits)])
+
+    return array('q', map(timecode_to_milliseconds, timecodes))
+
+
+def is_sorted(values):
+    """
+    Returns True if the given sequence is in non-decreasing order.
+    """
+    return all(map(le, values, itertools.islice(values, 1, None)))
+
 
+def filter_data(data, from_time, to_time, tc_ms=None, tc_ms_sorted=None):
+    """
+    Returns an iterator over the entries of data whose timecode lies within [from_time, to_time].
+    tc_ms may hold the timecodes of data already converted by timecodes_to_milliseconds; otherwise they are converted
+    in one batch up front, so data must be a sequence, and a ValueError is raised if an entry has no valid timecode.
+    Time-ordered data is cut with a binary search; tc_ms_sorted may tell whether tc_ms is in order, otherwise this is
+    checked on every call.
+    """
+    if not from_time and not to_time:
+        return iter(data)
 
-def filter_data(data, from_time, to_time):
-    from_time_ms = timecode_to_milliseconds(from_time) if from_time else None
-    to_time_ms = timecode_to_milliseconds(to_time) if to_time else None
+    from_time_ms = timecode_to_milliseconds(from_time) if from_time else -math.inf
+    to_time_ms = timecode_to_milliseconds(to_time) if to_time else math.inf
 
-    filtered_data = []
-    for entry in data:
-        tc_ms = timecode_to_milliseconds(entry['tc'])
-        if (from_time_ms is None or from_time_ms <= tc_ms) and (to_time_ms is None or tc_ms <= to_time_ms):
-            filtered_data.append(entry)
+    if tc_ms is None:
+        try:
+            tc_ms = timecodes_to_milliseconds(map(itemgetter('tc'), data))
+        except (KeyError, TypeError, ValueError) as error:
+            raise ValueError("Cannot filter by timecode: not every entry has a valid 'tc' value.") from error
 
-    return filtered_data
+    if tc_ms_sorted is None:
+        tc_ms_sorted = is_sorted(tc_ms)
 
+    if tc_ms_sorted:
+        start = bisect.bisect_left(tc_ms, from_time_ms)
+        stop = bisect.bisect_right(tc_ms, to_time_ms)
+        return iter(data[start:stop])
 
-def create_placemark(entry, ns):
-    placemark = kml.Placemark(ns)
-    placemark.name = entry['tc']
-    description = f"Timecode: {entry['tc']}\n"
-    for key, value in entry.items():
-        if key != 'tc':
-            description += f"{key}: {value}\n"
-    placemark.description = description.strip()
-    placemark.geometry = Point(entry['longitudeValue'], entry['latitudeValue'], entry['altitudeValue'])
+    return itertools.compress(data, [from_time_ms <= ms <= to_time_ms for ms in tc_ms])
 
-    placemark.extended_data = kml.ExtendedData()
-    for key, value in entry.items():
-        if key not in ('latitudeValue', 'longitudeValue', 'altitudeValue', 'tc'):
-            placemark.extended_data.elements.append(kml.Data(name=key, value=str(value)))
 
-    return placemark
+KML_HEADER = """<?xml version="1.0" encoding="UTF-8"?>
+<kml xmlns="http://www.opengis.net/kml/2.2">
+  <Document>
+"""
 
+KML_FOOTER = """  </Document>
+</kml>
+"""
 
-def export_kml(data, filename, downsample=0, add_placemarks=True, placemark_downsample=0):
-    ns = '{http://www.opengis.net/kml/2.2}'
 
-    k = kml.KML(ns)
-    doc = kml.Document(ns)
-    k.append(doc)
+# Returns the (longitude, latitude, altitude) values of an entry
+get_coordinates = itemgetter('longitudeValue', 'latitudeValue', 'altitudeValue')
 
-    line_string_coordinates = []
-    for index, entry in enumerate(data):
-        if index % (downsample + 1) == 0:
-            if add_placemarks and index % (placemark_downsample + 1) == 0:
-                placemark = create_placemark(entry, ns)
-                doc.append(placemark)
+# Returns the 'longitude,latitude,altitude' KML coordinate text of an entry
+format_coordinates = '{0[longitudeValue]},{0[latitudeValue]},{0[altitudeValue]}'.format
 
-            # Add coordinates to the line_string_coordinates list
-            line_string_coordinates.append((entry['longitudeValue'], entry['latitudeValue'], entry['altitudeValue']))
+# Keys that are not repeated in a placemark's ExtendedData
+PLACEMARK_SKIP_KEYS = frozenset(('latitudeValue', 'longitudeValue', 'altitudeValue', 'tc'))
 
-    # Create a LineString with the collected coordinates
-    line_string = LineString(line_string_coordinates)
 
-    # Create a Placemark and set its geometry attribute
-    line_placemark = kml.Placemark(ns)
-    line_placemark.geometry = line_string
-    doc.append(line_placemark)
+@functools.lru_cache(maxsize=None)
+def data_element_start(key):
+    """
+    Returns the opening '<Data name="..."><value>' tags of an ExtendedData element for the given key.
+    """
+    return f"<Data name={quoteattr(key)}><value>"
+
+
+def create_placemark(entry, coordinates=None):
+    """
+    Returns the KML Placemark element for the given entry as a string. coordinates may hold the entry's already
+    formatted coordinate text.
+    """
+    tc = entry['tc']
+    if coordinates is None:
+        coordinates = format_coordinates(entry)
 
-    with open(filename, 'w') as kml_file:
-        kml_file.write(k.to_string(prettyprint=True))
+    items = entry.items()
+    description = escape('\n'.join([f"Timecode: {tc}"] + [f"{key}: {value}" for key, value in items if key != 'tc']))
+    # Numbers never need escaping, so only other values go through escape()
+    extended_data = ''.join([f"{data_element_start(key)}"
+                             f"{value if isinstance(value, (int, float)) else escape(str(value))}</value></Data>"
+                             for key, value in items if key not in PLACEMARK_SKIP_KEYS])
+
+    return (f"    <Placemark>\n"
+            f"      <name>{escape(tc)}</name>\n"
+            f"      <description>{description}</description>\n"
+            f"      <ExtendedData>{extended_data}</ExtendedData>\n"
+            f"      <Point><coordinates>{coordinates}</coordinates></Point>\n"
+            f"    </Placemark>\n")
+
+
+def export_kml(data, filename, downsample=0, add_placemarks=True, placemark_downsample=0):
+    """
+    Writes the given data to the specified KML file as a track LineString, optionally with a Placemark per entry.
+    The KML text is written directly while iterating over data.
+    """
+    with open(filename, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as kml_file:
+        kml_file.write(KML_HEADER)
+
+        # Only every (downsample + 1)th entry is visited; a placemark is added when the original index is also a
+        # multiple of (placemark_downsample + 1), i.e. on every placemark_step-th visited entry
+        step = downsample + 1
+        placemark_step = (placemark_downsample + 1) // math.gcd(step, placemark_downsample + 1)
+        entries = itertools.islice(data, 0, None, step)
+
+        if add_placemarks:
+            line_string_coordinates = []
+            for index, entry in enumerate(entries):
+                coordinates = format_coordinates(entry)
+                if index % placemark_step == 0:
+                    kml_file.write(create_placemark(entry, coordinates))
+
+                # Add coordinates to the line_string_coordinates list
+                line_string_coordinates.append(coordinates)
+
+            coordinates = ' '.join(line_string_coordinates)
+        else:
+            # Without placemarks only the coordinate columns are needed: collect their values without a Python-level
+            # loop and format the whole track with a single %-format call
+            values = tuple(itertools.chain.from_iterable(map(get_coordinates, entries)))
+            coordinates = ' '.join(['%s,%s,%s'] * (len(values) // 3)) % values
+
+        # Write a Placemark holding a LineString with the collected coordinates
+        kml_file.write(f"    <Placemark>\n"
+                       f"      <LineString><coordinates>{coordinates}</coordinates></LineString>\n"
+                       f"    </Placemark>\n")
+
+        kml_file.write(KML_FOOTER)
 
 
 class Application(tk.Frame):
@@ -147,6 +467,9 @@ class Application(tk.Frame):
         self.help()
 
         self.json_data = []
+        self.tc_ms = array('q')
+        self.tc_ms_sorted = True
+        self.all_keys = []
 
     def help(self):
         # Instructions
@@ -154,7 +477,7 @@ class Application(tk.Frame):
 
                 1) Click 'Select Folder' to choose a folder containing *.dlog files.
 
-                2) Click 'Unzip Files' to extract the *.dlog files from any GZ archives in the selected folder.
+                2) Optionally click 'Unzip Files' to extract the *.dlog files from any GZ archives in the selected folder. Compressed *.dlog.gz files are also read directly.
 
                 3) Click 'Refresh Data' to load the data from the *.dlog files in the selected folder.
 
@@ -309,15 +632,24 @@ class Application(tk.Frame):
 
         if folder_path:
             self.folder_path = folder_path
+
+            # Forget the dataset of the previous folder, so that exporting loads the new one
+            self.json_data = []
+            self.tc_ms = array('q')
+            self.tc_ms_sorted = True
+            self.all_keys = []
+            self.export_csv_button.config(state="disabled")
+            self.export_kml_button.config(state="disabled")
         self.folder_info_label.config(text="Selected folder: " + folder_path)
+        dlog_files_list, gz_files = scan_folder(self.folder_path)
+
         # Check if there are any *.gz files in the folder
-        if any(file.endswith('.gz') for file in os.listdir(self.folder_path)):
+        if gz_files:
             self.unzip_files_button.config(state="normal")
         else:
             self.unzip_files_button.config(state="disabled")
 
         # Check if there are any *.dlog files in the folder
-        dlog_files_list = find_dlog_files(self.folder_path)
         if dlog_files_list:
             first_file = Path(dlog_files_list[0]).name
             file_count = len(dlog_files_list)
@@ -342,22 +674,90 @@ class Application(tk.Frame):
             self.file_info_label.config(text="")
             self.refresh_data_button.config(state="disabled")
 
-    def refresh_data(self):
+    def run_in_background(self, work, done):
+        """
+        Runs work() on a worker thread so the window stays responsive, with the action buttons disabled and a busy
+        cursor shown until it has finished. done(result) is then called on the Tk main loop.
+        """
+        buttons = (self.select_folder_button, self.unzip_files_button, self.refresh_data_button,
+                   self.export_csv_button, self.export_kml_button)
+        button_states = {button: button.cget("state") for button in buttons}
+        for button in buttons:
+            button.config(state="disabled")
+        self.master.config(cursor="watch")
+
+        def finish(result, error):
+            self.master.config(cursor="")
+            for button, state in button_states.items():
+                button.config(state=state)
+            if error is not None:
+                messagebox.showerror("Error", str(error))
+            else:
+                done(result)
+
+        def worker():
+            try:
+                result = work()
+            except Exception as error:
+                self.master.after(0, finish, None, error)
+            else:
+                self.master.after(0, finish, result, None)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def get_time_range(self):
+        """
+        Returns the (from_time, to_time) timecodes of the TC filter, with "" for a bound left at 00:00:00:00.
+        """
+        from_time = f"{self.from_time_hh.get()}:{self.from_time_mm.get()}:{self.from_time_ss.get()}:{self.from_time_ff.get()}"
+        to_time = f"{self.to_time_hh.get()}:{self.to_time_mm.get()}:{self.to_time_ss.get()}:{self.to_time_ff.get()}"
+
+        if (from_time == "00:00:00:00"):
+            from_time = ""
+
+        if (to_time == "00:00:00:00"):
+            to_time = ""
+
+        return from_time, to_time
+
+    def refresh_data(self, on_loaded=None):
         if not hasattr(self, 'folder_path'):
             messagebox.showwarning("Folder Not Selected", "Please select a folder first.")
             return
 
-        dlog_files_list = find_dlog_files(self.folder_path)
-        combined_json = combine_json_files(dlog_files_list)
-        self.json_data = combined_json
+        folder_path = self.folder_path
 
-        # Update filter keys
-        keys = set()
-        for entry in self.json_data:
-            keys.update(entry.keys())
+        def load():
+            dlog_files_list = find_dlog_files(folder_path)
+            combined_json = combine_json_files(dlog_files_list)
+            try:
+                tc_ms = timecodes_to_milliseconds(map(itemgetter('tc'), combined_json))
+            except (KeyError, TypeError, ValueError):
+                # Not every entry has a usable timecode: the data can still be exported without a TC range
+                tc_ms = None
+
+            # Collect all keys in order of first appearance, visiting each distinct key layout only once
+            key_layouts = dict.fromkeys(map(tuple, combined_json))
+            all_keys = list(dict.fromkeys(itertools.chain.from_iterable(key_layouts)))
+
+            return combined_json, tc_ms, tc_ms is not None and is_sorted(tc_ms), all_keys
+
+        def loaded(result):
+            self.show_data(*result)
+            messagebox.showinfo("Data Refreshed", "Dataset refreshed.")
+            if on_loaded is not None and self.json_data:
+                on_loaded()
 
-        keys = sorted(keys)
+        self.run_in_background(load, loaded)
 
+    def show_data(self, combined_json, tc_ms, tc_ms_sorted, all_keys):
+        self.json_data = combined_json
+        self.tc_ms = tc_ms
+        self.tc_ms_sorted = tc_ms_sorted
+        self.all_keys = all_keys
+
+        # Update filter keys
+        keys = sorted(all_keys)
         for key in keys:
             var = tk.BooleanVar(value=True)
             self.filter_keys_vars[key] = var
@@ -387,70 +787,123 @@ class Application(tk.Frame):
                 col += 1
                 row = 0
 
-        messagebox.showinfo("Data Refreshed", "Dataset refreshed.")
-
     def export_csv(self):
         if not hasattr(self, 'folder_path'):
             messagebox.showwarning("Folder Not Selected", "Please select a folder first.")
             return
 
-        dlog_files_list = find_dlog_files(self.folder_path)
-        combined_json = combine_json_files(dlog_files_list)
-
-        csv_file = filedialog.asksaveasfilename(defaultextension=".csv")
+        # Reuse the dataset loaded by refresh_data instead of parsing the files again
+        if not self.json_data:
+            self.refresh_data(on_loaded=self.export_csv)
+            return
+        combined_json = self.json_data
+        tc_ms = self.tc_ms
+        tc_ms_sorted = self.tc_ms_sorted
+
+        file_formats = {"CSV files": ("CSV", ".csv"), "Parquet files": ("Parquet", ".parquet"),
+                        "Feather files": ("Feather", ".feather")}
+        # Parquet and Feather are only offered when pyarrow is installed
+        offered_types = file_formats if pyarrow is not None else ["CSV files"]
+        file_type = tk.StringVar(self, value="CSV files")
+        filetypes = [(name, f"*{file_formats[name][1]}") for name in offered_types]
+        csv_file = filedialog.asksaveasfilename(filetypes=filetypes, typevariable=file_type)
         if csv_file:
-            #from_time = self.from_time_entry.get()
-            #to_time = self.to_time_entry.get()
-
-            from_time = f"{self.from_time_hh.get()}:{self.from_time_mm.get()}:{self.from_time_ss.get()}:{self.from_time_ff.get()}"
-            to_time = f"{self.to_time_hh.get()}:{self.to_time_mm.get()}:{self.to_time_ss.get()}:{self.to_time_ff.get()}"
-
-            if (from_time == "00:00:00:00"):
-                from_time = ""
-
-            if (to_time == "00:00:00:00"):
-                to_time = ""
-
-            filtered_data = filter_data(combined_json, from_time, to_time)
+            # A typed extension picks the format; otherwise the selected file type does, and supplies the extension
+            export_format, extension = file_formats.get(file_type.get(), file_formats["CSV files"])
+            typed_extension = os.path.splitext(csv_file)[1].lower()
+            if not typed_extension:
+                csv_file += extension
+            else:
+                formats_by_extension = {ext: format_name for format_name, ext in file_formats.values()}
+                export_format = formats_by_extension.get(typed_extension, export_format)
+
+            from_time, to_time = self.get_time_range()
+            downsample = int(self.csv_downsample_entry.get())
 
             # Get the list of keys to include based on the filter
-            keys_to_include = [key for key in filtered_data[0].keys() if self.filter_keys_vars[key].get()]
+            keys_to_include = [key for key in self.all_keys if self.filter_keys_vars[key].get()]
 
-            write_json_to_csv(filtered_data, csv_file, downsample=int(self.csv_downsample_entry.get()),
-                              keys_to_include=keys_to_include)
+            def export():
+                filtered_data = filter_data(combined_json, from_time, to_time, tc_ms=tc_ms, tc_ms_sorted=tc_ms_sorted)
+                if export_format == "CSV":
+                    write_json_to_csv(filtered_data, csv_file, downsample=downsample, keys_to_include=keys_to_include)
+                else:
+                    write_json_to_table(filtered_data, csv_file, downsample=downsample, keys_to_include=keys_to_include)
 
-            messagebox.showinfo("CSV Exported", f"CSV file exported to: {csv_file}")
+            self.run_in_background(export, lambda result: messagebox.showinfo(
+                f"{export_format} Exported", f"{export_format} file exported to: {csv_file}"))
 
     def export_kml(self):
         if not hasattr(self, 'folder_path'):
             messagebox.showwarning("Folder Not Selected", "Please select a folder first.")
             return
 
-        dlog_files_list = find_dlog_files(self.folder_path)
-        combined_json = combine_json_files(dlog_files_list)
+        # Reuse the dataset loaded by refresh_data instead of parsing the files again
+        if not self.json_data:
+            self.refresh_data(on_loaded=self.export_kml)
+            return
+        combined_json = self.json_data
+        tc_ms = self.tc_ms
+        tc_ms_sorted = self.tc_ms_sorted
 
         kml_file = filedialog.asksaveasfilename(defaultextension=".kml")
         if kml_file:
-            from_time = self.from_time_entry.get()
-            to_time = self.to_time_entry.get()
-            filtered_data = filter_data(combined_json, from_time, to_time)
-            downsample = int(input("Enter a downsample factor for the KML output: "))
-            placemark_downsample = int(input("Enter a downsample factor for the Placemark objects in the KML output: "))
-            add_placemarks = messagebox.askyesno("Add Placemarks",
-                                                 "Would you like to add Placemark objects to the KML output?")
-            export_kml(filtered_data, kml_file, downsample=downsample, add_placemarks=add_placemarks,
-                       placemark_downsample=placemark_downsample)
-            messagebox.showinfo("KML Exported", f"KML file exported to: {kml_file}")
+            from_time, to_time = self.get_time_range()
+            downsample = int(self.kml_downsample_entry.get())
+            placemark_downsample = int(self.placemark_downsample_entry.get())
+            add_placemarks = self.kml_placemark_var.get()
+
+            def export():
+                filtered_data = filter_data(combined_json, from_time, to_time, tc_ms=tc_ms, tc_ms_sorted=tc_ms_sorted)
+                export_kml(filtered_data, kml_file, downsample=downsample, add_placemarks=add_placemarks,
+                           placemark_downsample=placemark_downsample)
+
+            self.run_in_background(export, lambda result: messagebox.showinfo("KML Exported",
+                                                                              f"KML file exported to: {kml_file}"))
 
     def filter_data(self, data):
-        from_time = self.from_time_entry.get()
-        to_time = self.to_time_entry.get()
+        from_time, to_time = self.get_time_range()
         return filter_data(data, from_time, to_time)
 
-
-root = tk.Tk()
-app = Application(master=root)
-app.mainloop()
+def main(argv=None):
+    """
+    Command-line entry point: exports the *.dlog files of a folder to a CSV file. The files are read, filtered and
+    written one at a time, so the whole dataset is never held in memory at once.
+    """
+    parser = argparse.ArgumentParser(description="Export the *.dlog files of a folder to a CSV file.")
+    parser.add_argument('folder', help="folder containing the *.dlog files")
+    parser.add_argument('csv_file', nargs='?', default='output.csv', help="CSV file to create (default: output.csv)")
+    parser.add_argument('--downsample', type=int, default=0, help="number of entries to skip after each exported one")
+    parser.add_argument('--from-tc', default='', help="first timecode to export, as HH:MM:SS:FF")
+    parser.add_argument('--to-tc', default='', help="last timecode to export, as HH:MM:SS:FF")
+    args = parser.parse_args(argv)
+
+    for timecode in (args.from_tc, args.to_tc):
+        try:
+            if timecode:
+                timecode_to_milliseconds(timecode)
+        except ValueError:
+            parser.error(f"invalid timecode: {timecode}")
+
+    dlog_files_list = find_dlog_files(args.folder)
+    if not dlog_files_list:
+        parser.error(f"no *.dlog files found in {args.folder}")
+
+    json_data = itertools.chain.from_iterable(filter_data(json_chunk, args.from_tc, args.to_tc)
+                                              for json_chunk in iter_json_chunks(dlog_files_list))
+    try:
+        write_json_to_csv(json_data, args.csv_file, downsample=args.downsample)
+    except ValueError as error:
+        parser.error(str(error))
+
+def gui_main():
+    root = tk.Tk()
+    app = Application(master=root)
+    app.mainloop()
+
+
+if __name__ == '__main__':
+    gui_main()
 
 #unzip_files("compData")
 
@@ -0,0 +1,34 @@
+import unittest
+
+from telemExplorer import timecode_to_milliseconds, timecodes_to_milliseconds
+
+
+class TimecodesToMillisecondsTest(unittest.TestCase):
+
+    def assert_matches_scalar(self, timecodes):
+        self.assertEqual(list(timecodes_to_milliseconds(timecodes)), [timecode_to_milliseconds(tc) for tc in timecodes])
+
+    def test_fixed_width(self):
+        self.assert_matches_scalar(['00:00:00:00', '01:02:03:04', '12:34:56:29', '23:59:59:29', '99:99:99:99'])
+
+    def test_mixed_width_with_aligned_separators(self):
+        # The joined buffer is 22 characters with ':' at every separator offset, but neither timecode is 11 wide
+        timecodes = ['12:34:56:7', '890:12:34:56']
+        self.assertEqual(list(timecodes_to_milliseconds(timecodes)), [45296233, 3204755866])
+        self.assert_matches_scalar(timecodes)
+
+    def test_variable_width(self):
+        self.assert_matches_scalar(['1:2:3:4', '01:02:03:04', '100:00:00:00'])
+
+    def test_empty(self):
+        self.assertEqual(list(timecodes_to_milliseconds([])), [])
+
+    def test_invalid_timecode_raises(self):
+        for timecode in ('ab:cd:ef:gh', '--:--:--:--', '01:02:03:0x'):
+            with self.subTest(timecode=timecode):
+                with self.assertRaises(ValueError):
+                    timecodes_to_milliseconds(['01:00:00:00', timecode])
+
+
+if __name__ == '__main__':
+    unittest.main()